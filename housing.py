@@ -1,175 +1,24 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import joblib
 import plotly.graph_objects as go
 from datetime import datetime
+from pathlib import Path
+import pickle
+import textwrap
 
 # --- CONFIGURATION & THEME ---
 st.set_page_config(page_title="KenyaHomes | Housing Intelligence", layout="wide")
 
 # Custom CSS for Premium Look, Layout Margins, and Navigation Header
-st.markdown("""
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;600;700&display=swap');
-    
-    html, body, [class*="css"] { font-family: 'Inter', sans-serif; }
-    
-    /* Main Layout Margins */
-    .main { padding: 0rem 5rem; }
-    
-    /* Professional Header Navigation */
-    .nav-header {
-        display: flex;
-        justify-content: center;
-        background-color: #ffffff;
-        padding: 15px 0;
-        border-bottom: 2px solid #D4AF37;
-        position: sticky;
-        top: 0;
-        z-index: 999;
-        margin-bottom: 30px;
-    }
-    .nav-item {
-        margin: 0 25px;
-        text-decoration: none;
-        color: #003366;
-        font-weight: 600;
-        font-size: 0.9rem;
-        transition: 0.3s;
-        text-transform: uppercase;
-        letter-spacing: 1px;
-    }
-    .nav-item:hover { color: #D4AF37; }
-
-    /* Hero Section */
-    .hero-container {
-        background: linear-gradient(135deg, #003366 0%, #002244 100%);
-        color: white; padding: 60px; border-radius: 15px;
-        text-align: center; margin-bottom: 40px;
-    }
-    
-    .metric-card {
-        background: white; border: 1px solid #e2e8f0;
-        padding: 25px; border-radius: 12px; 
-        box-shadow: 0 4px 12px rgba(0,0,0,0.05);
-        text-align: center;
-    }
-    .ai-banner {
-        background-color: #f8fafc;
-        text-align: center;
-        padding: 10px 0;
-        border-bottom: 2px solid #D4AF37;
-        font-size: 0.9rem;
-        font-weight: 600;
-        color: #1e293b;
-        letter-spacing: 0.5px;
-    }
-    .ai-dot {
-        height: 8px;
-        width: 8px;
-        background-color: #10b981;
-        border-radius: 50%;
-        display: inline-block;
-        margin-right: 8px;
-        box-shadow: 0 0 8px #10b981;
-    }
-    .section-header {
-        display: flex;
-        align-items: center;
-        gap: 12px;
-        color: #1a472a; /* Dark Greenish Tint from image */
-        font-family: 'Inter', sans-serif;
-        margin-bottom: 25px;
-    }
-    .section-header i {
-        font-size: 1.5rem;
-    }
-    .section-header h2 {
-        margin: 0;
-        font-size: 1.8rem;
-        font-weight: 600;
-    }
-    
-    /* Label with Icons styling */
-    .field-label {
-        display: flex;
-        align-items: center;
-        gap: 8px;
-        font-weight: 600;
-        color: #374151;
-        margin-bottom: -15px; /* Adjusting for Streamlit widget spacing */
-        font-size: 0.95rem;
-    }
-    .field-label i {
-        color: #9ca3af; /* Muted icon color from image */
-        font-size: 1rem;
-    }
-            .calc-container {
-        background-color: #ffffff;
-        padding: 30px;
-        border-radius: 15px;
-        border: 1px solid #e2e8f0;
-        box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1);
-    }
-    .cost-card {
-        background: #f8fafc;
-        border-left: 5px solid #D4AF37;
-        padding: 20px;
-        border-radius: 8px;
-        margin-bottom: 15px;
-    }
-    .cost-label {
-        color: #64748b;
-        font-size: 0.85rem;
-        text-transform: uppercase;
-        letter-spacing: 1px;
-        font-weight: 600;
-    }
-    .cost-value {
-        color: #003366;
-        font-size: 1.8rem;
-        font-weight: 700;
-        margin: 5px 0;
-    }
-    .total-box {
-        background: linear-gradient(135deg, #003366 0%, #002244 100%);
-        color: white;
-        padding: 30px;
-        border-radius: 12px;
-        text-align: center;
-    }
-    .calc-card {
-        background: #ffffff;
-        border-radius: 15px;
-        padding: 25px;
-        border: 1px solid #e2e8f0;
-        box-shadow: 0 4px 12px rgba(0,0,0,0.05);
-    }
-    /* Breakdown Item Styling */
-    .breakdown-row {
-        display: flex;
-        justify-content: space-between;
-        padding: 12px 0;
-        border-bottom: 1px solid #f1f5f9;
-    }
-    .item-label { color: #64748b; font-weight: 500; }
-    .item-value { color: #0f172a; font-weight: 700; }
-    
-    /* Premium Total Box */
-    .total-box-v2 {
-        background: linear-gradient(135deg, #003366 0%, #004080 100%);
-        color: white;
-        padding: 25px;
-        border-radius: 12px;
-        text-align: center;
-        margin-top: 20px;
-    }
-    </style>
-""", unsafe_allow_html=True)
+@st.cache_data(show_spinner=False)
+def load_page_css():
+    # Stylesheet lives in kenya_styles.css; read from disk once, then served from cache
+    css = (Path(__file__).parent / "kenya_styles.css").read_text()
+    return f"<style>\n{css}</style>\n"
 
 # --- NAVIGATION HEADER ---
-st.markdown(f"""
+NAV_HTML = """
     <div class="nav-header">
         <a class="nav-item" href="#kenya-house">Kenya House</a>
         <a class="nav-item" href="#price-predictor">Price Predictor</a>
@@ -177,27 +26,15 @@ st.markdown(f"""
         <a class="nav-item" href="#material-forecast">Material Forecast</a>
         <a class="nav-item" href="#location">Location</a>
     </div>
-""", unsafe_allow_html=True)
-st.markdown("""
     <div class="ai-banner">
         <span class="ai-dot"></span> AI-Powered Predictions • 2000-2025 Historical Data
     </div>
-""", unsafe_allow_html=True)
-
+"""
 
-# --- MODEL LOADING ---
-@st.cache_resource
-def load_bundle():
-    try:
-        return joblib.load("rf_GRB_Model3.pkl")
-    except:
-        return None
-
-model = load_bundle()
 
 # --- KENYA HOUSE (HERO SECTION) ---
-st.markdown('<div id="kenya-house"></div>', unsafe_allow_html=True)
-st.markdown("""
+HERO_HTML = """
+    <div id="kenya-house"></div>
     <div class="hero-container">
         <h1 style='font-weight:700; font-size: 2.8rem;color:white;'>KenyaHomes Intelligence</h1>
         <p style='font-size: 1.2rem; opacity: 0.9;'>Powered by ensemble machine learning models trained on 25 years of Kenyan housing data. 
@@ -208,13 +45,30 @@ st.markdown("""
             <div><h2 style='margin-bottom:0;color:white;'>25Y+</h2><p>Data Assets</p></div>
         </div>
     </div>
-""", unsafe_allow_html=True)
+"""
+
+# All static page chrome (CSS, nav, banner, hero) goes out in a single markdown call
+STATIC_HTML = load_page_css() + textwrap.dedent(NAV_HTML + HERO_HTML)
+st.markdown(STATIC_HTML, unsafe_allow_html=True)
+
+# --- MODEL LOADING ---
+@st.cache_resource
+def load_bundle():
+    # Deferred import: only paid on the first (cached) model load
+    import joblib
+    try:
+        return joblib.load("rf_GRB_Model3.pkl")
+    except (OSError, ImportError, pickle.UnpicklingError, ValueError) as e:
+        # Missing file, or a pickle this numpy/sklearn stack cannot load
+        st.warning(f"Model file unavailable: {e}")
+        return None
+
+model = load_bundle()
 
 
 # --- PRICE PREDICTOR SECTION ---
 
-st.markdown('<div id="price-predictor"></div>', unsafe_allow_html=True)
-st.header("🏠 House Price Prediction")
+st.header("🏠 House Price Prediction", anchor="price-predictor")
 st.markdown("""
     <h2 class="predict-h2">Predict Your Dream Home's Price</h2>
     <h3 class="predict-h3">Enter your property requirements and get an accurate price prediction based on current market data and ML models.</h3>
@@ -270,8 +124,20 @@ st.markdown("<br>", unsafe_allow_html=True)
 st.markdown("---")
 
 # --- CALCULATOR LOGIC & UI ---
-st.markdown('<div id="expenses" style="padding-top: 50px;"></div>', unsafe_allow_html=True)
-st.header("🏗️ Construction Cost Calculator")
+# Build cost per m² (KES) for each standard of finish
+FINISH_RATES = {"Standard (Budget)": 42000, "Middle-Class": 60000, "Luxurious (Premium)": 85000}
+
+# Budget share of each construction phase (sums to 1.0)
+BREAKDOWN_PHASES = (
+    "Substructure (Foundation)",
+    "Walling & Superstructure",
+    "Roofing & Ceiling",
+    "Finishes (Tiles, Paint, Joinery)",
+    "Electrical & Plumbing"
+)
+BREAKDOWN_RATIOS = np.array([0.18, 0.32, 0.15, 0.25, 0.10])
+
+st.header("🏗️ Construction Cost Calculator", anchor="expenses")
 st.write("Professional estimate based on 2026 Kenyan Building Indices.")
 
 with st.container():
@@ -282,7 +148,7 @@ with st.container():
         with st.container(border=True):
             # 1. Standard of Finish
             build_type = st.selectbox("Standard of Finish", 
-                ["Standard (Budget)", "Middle-Class", "Luxurious (Premium)"], 
+                list(FINISH_RATES), 
                 index=1)
             
             # 2. Square Meters
@@ -292,8 +158,7 @@ with st.container():
             num_floors = st.select_slider("Number of Floors", options=[1, 2, 3, 4, 5], value=1)
             
             # LOGIC: Mapping Rates & Floor Multipliers
-            rates = {"Standard (Budget)": 42000, "Middle-Class": 60000, "Luxurious (Premium)": 85000}
-            base_rate = rates[build_type]
+            base_rate = FINISH_RATES[build_type]
             
             # Floor multiplier: 1 floor=1.0, 2 floors=1.15 (slab), 3+ floors=1.25 (structural reinforcement)
             floor_multiplier = 1.0 if num_floors == 1 else (1.15 if num_floors == 2 else 1.25)
@@ -303,14 +168,8 @@ with st.container():
     with col_output:
         st.subheader("Budget Breakdown")
         
-        # Breakdown calculation logic
-        breakdown = {
-            "Substructure (Foundation)": total_estimate * 0.18,
-            "Walling & Superstructure": total_estimate * 0.32,
-            "Roofing & Ceiling": total_estimate * 0.15,
-            "Finishes (Tiles, Paint, Joinery)": total_estimate * 0.25,
-            "Electrical & Plumbing": total_estimate * 0.10
-        }
+        # Breakdown calculation logic: one vectorized multiply over all phases
+        breakdown_costs = total_estimate * BREAKDOWN_RATIOS
 
         # Clearer Organizational View
         with st.container(border=True):
@@ -321,14 +180,13 @@ with st.container():
             
             st.markdown("<hr style='margin:10px 0;'>", unsafe_allow_html=True)
             
-            # Detailed Items
-            for item, cost in breakdown.items():
-                st.markdown(f"""
-                    <div class="breakdown-row">
-                        <span class="item-label">{item}</span>
-                        <span class="item-value">KES {cost:,.0f}</span>
-                    </div>
-                """, unsafe_allow_html=True)
+            # Detailed Items: all rows joined and sent as a single markdown block
+            rows_html = "".join(
+                f'<div class="breakdown-row"><span class="item-label">{item}</span>'
+                f'<span class="item-value">KES {cost:,.0f}</span></div>'
+                for item, cost in zip(BREAKDOWN_PHASES, breakdown_costs)
+            )
+            st.markdown(rows_html, unsafe_allow_html=True)
 
             # Highlighted Total
             st.markdown(f"""
@@ -348,6 +206,8 @@ if 'selected_material' not in st.session_state:
     st.session_state.selected_material = "Cement (50kg bag)"
 
 # --- 2. MATERIAL PREDICTION LOGIC ---
+# Pure function of constants: computed once, then served from cache on reruns
+@st.cache_data(show_spinner=False)
 def get_material_predictions():
     years = np.arange(2025, 2036)
     materials_config = {
@@ -361,20 +221,26 @@ def get_material_predictions():
         "Floor Tiles (m²)": {"base": 1450, "rate": 0.050, "icon": "✨", "color": "#ec4899"}
     }
     
-    forecast_data = {"Year": years}
-    for name, config in materials_config.items():
-        forecast_data[name] = [config["base"] * (1 + config["rate"])**i for i in range(len(years))]
-        
-    return pd.DataFrame(forecast_data), materials_config
+    # All material trajectories as one (materials x years) broadcast matrix
+    bases = np.array([c["base"] for c in materials_config.values()], dtype=np.float64)
+    rates = np.array([c["rate"] for c in materials_config.values()])
+    prices = bases[:, None] * (1 + rates[:, None]) ** np.arange(len(years))
+
+    # Wrap the matrix in a single DataFrame construction (years as rows)
+    df = pd.DataFrame(prices.T, columns=list(materials_config))
+    df.insert(0, "Year", years)
+
+    return df, materials_config
 
 df_forecast, config = get_material_predictions()
 
 # --- 3. UI SECTION: INTERACTIVE CARDS ---
-st.markdown('<div id="material-forecast" style="padding-top: 50px;"></div>', unsafe_allow_html=True)
-st.header("📈 10-Year Material Price Intelligence")
+st.header("📈 10-Year Material Price Intelligence", anchor="material-forecast")
 st.write("Click on any material card below to view its specific 10-year forecast on the graph.")
 
 # Predictive Cost Breakdown Grid (Clickable)
+# Final-year row is looked up once instead of per card
+final_prices = df_forecast.iloc[-1]
 cols = st.columns(4)
 for i, (name, info) in enumerate(config.items()):
     with cols[i % 4]:
@@ -387,7 +253,7 @@ for i, (name, info) in enumerate(config.items()):
         border_style = f"2px solid {info['color']}" if is_selected else "1px solid #e2e8f0"
         bg_style = "#f8fafc" if is_selected else "white"
         
-        future_p = df_forecast[name].iloc[-1]
+        future_p = final_prices[name]
         growth = ((future_p / info['base']) - 1) * 100
         
         st.markdown(f"""
@@ -399,48 +265,65 @@ for i, (name, info) in enumerate(config.items()):
         """, unsafe_allow_html=True)
 
 # --- 4. DYNAMIC FORECAST CHART ---
+# Figure depends only on the selected material, so build it once per selection.
+# cache_resource hands back the same (never mutated) Figure, which st.plotly_chart
+# serializes without re-validating, unlike a dict.
+@st.cache_resource(show_spinner=False)
+def build_material_fig(selected):
+    df_forecast, config = get_material_predictions()
+    selected_color = config[selected]['color']
+
+    fig_mat = go.Figure()
+
+    # Plain ndarrays spare plotly a pandas conversion per trace
+    years = df_forecast['Year'].to_numpy()
+    selected_prices = df_forecast[selected].to_numpy()
+
+    # Add the selected material line (Thick and Highlighted)
+    traces = [go.Scattergl(
+        x=years, 
+        y=selected_prices, 
+        name=selected,
+        mode='lines+markers+text',
+        text=[f"{v:,.0f}" if y % 2 == 0 else "" for y, v in zip(years, selected_prices)],
+        textposition="top center",
+        line=dict(width=5, color=selected_color),
+        marker=dict(size=10, symbol='diamond')
+    )]
+
+    # Add other materials as faint reference lines
+    for name, info in config.items():
+        if name != selected:
+            traces.append(go.Scattergl(
+                x=years, 
+                y=df_forecast[name].to_numpy(), 
+                name=name,
+                mode='lines',
+                line=dict(width=1, color='#e2e8f0'),
+                showlegend=False,
+                hoverinfo='skip'
+            ))
+
+    # Single add_traces call validates the figure once instead of per trace
+    fig_mat.add_traces(traces)
+
+    fig_mat.update_layout(
+        xaxis_title="Forecast Year",
+        yaxis_title="Price (KES)",
+        template="plotly_white",
+        hovermode="x",
+        height=450,
+        margin=dict(l=0, r=0, t=20, b=0)
+    )
+    return fig_mat
+
 selected = st.session_state.selected_material
-selected_color = config[selected]['color']
 
 st.subheader(f"Focus Forecast: {selected}")
-
-fig_mat = go.Figure()
-
-# Add the selected material line (Thick and Highlighted)
-fig_mat.add_trace(go.Scatter(
-    x=df_forecast['Year'], 
-    y=df_forecast[selected], 
-    name=selected,
-    mode='lines+markers+text',
-    text=[f"{v:,.0f}" if y % 2 == 0 else "" for y, v in zip(df_forecast['Year'], df_forecast[selected])],
-    textposition="top center",
-    line=dict(width=5, color=selected_color),
-    marker=dict(size=10, symbol='diamond')
-))
-
-# Add other materials as faint reference lines
-for name, info in config.items():
-    if name != selected:
-        fig_mat.add_trace(go.Scatter(
-            x=df_forecast['Year'], 
-            y=df_forecast[name], 
-            name=name,
-            mode='lines',
-            line=dict(width=1, color='#e2e8f0'),
-            showlegend=False,
-            hoverinfo='skip'
-        ))
-
-fig_mat.update_layout(
-    xaxis_title="Forecast Year",
-    yaxis_title="Price (KES)",
-    template="plotly_white",
-    hovermode="x",
-    height=450,
-    margin=dict(l=0, r=0, t=20, b=0)
-)
-st.plotly_chart(fig_mat, use_container_width=True)
+st.plotly_chart(build_material_fig(selected), use_container_width=True)
 
 # 5. Data Export
 with st.expander("View Full Forecast Data Table"):
-    st.dataframe(df_forecast.style.format(lambda x: f"KES {x:,.2f}" if isinstance(x, (int, float)) and x > 2000 else x), use_container_width=True)
\ No newline at end of file
+    # Format price columns only, with one bound formatter (no per-cell isinstance lambda)
+    price_format = "KES {:,.2f}".format
+    st.dataframe(df_forecast.style.format({name: price_format for name in config}), use_container_width=True)
\ No newline at end of file